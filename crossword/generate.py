@@ -1,8 +1,13 @@
 import sys
 
+from collections import deque
+
 from crossword import *
-from copy import deepcopy
-from random import choice
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class CrosswordCreator():
@@ -16,6 +21,81 @@ class CrosswordCreator():
             var: self.crossword.words.copy()
             for var in self.crossword.variables
         }
+        self._nvars = len(self.crossword.variables)
+
+        # Variables not yet assigned, kept in sync by backtrack so
+        # select_unassigned_variable never has to scan the full set
+        self._unassigned = set(self.crossword.variables)
+
+        # Words currently assigned, for O(1) duplicate checks
+        self._used_words = set()
+
+        # Cache overlap and neighbor lookups once; the search loops below
+        # hit these on every word comparison
+        self._ov = {
+            pair: overlap
+            for pair, overlap in self.crossword.overlaps.items()
+            if overlap is not None
+        }
+        # frozensets allow both iteration and O(1) membership/set ops
+        self._neighbors = {
+            var: frozenset(self.crossword.neighbors(var))
+            for var in self.crossword.variables
+        }
+
+        # Inverted index: self._letter_at[var][k][c] is the set of words
+        # in var's domain with character c at position k. Lets revise()
+        # test arc support with one dict lookup instead of scanning the
+        # whole neighboring domain.
+        self._letter_at = {}
+        self._rebuild_letter_index()
+
+        # Trail of (var, word) removals made by revise(); backtrack
+        # records a mark before propagating and pops back to it on
+        # failure instead of copying and restoring whole domains
+        self._trail = []
+
+    def _index_domain(self, var):
+        """
+        Rebuild the (position, letter) buckets for `var` from its domain.
+        """
+        buckets = [dict() for _ in range(var.length)]
+        for word in self.domains[var]:
+            # before node consistency, domains may hold words of the
+            # wrong length; only index positions the word actually has
+            for k in range(min(var.length, len(word))):
+                buckets[k].setdefault(word[k], set()).add(word)
+        self._letter_at[var] = buckets
+
+    def _rebuild_letter_index(self):
+        """
+        Rebuild the (position, letter) buckets for every variable.
+        """
+        for var in self.domains:
+            self._index_domain(var)
+
+    def _discard_word(self, var, word):
+        """
+        Remove `word` from var's domain and from its letter buckets.
+        """
+        self.domains[var].discard(word)
+        for k in range(min(var.length, len(word))):
+            bucket = self._letter_at[var][k].get(word[k])
+            if bucket:
+                bucket.discard(word)
+        self._trail.append((var, word))
+
+    def _undo_to(self, mark):
+        """
+        Pop trail entries back to `mark`, restoring the pruned words to
+        their domains and letter buckets.
+        """
+        while len(self._trail) > mark:
+            var, word = self._trail.pop()
+            self.domains[var].add(word)
+            buckets = self._letter_at[var]
+            for k in range(min(var.length, len(word))):
+                buckets[k].setdefault(word[k], set()).add(word)
 
     def letter_grid(self, assignment):
         """
@@ -92,21 +172,80 @@ class CrosswordCreator():
         Enforce node and arc consistency, and then solve the CSP.
         """
         self.enforce_node_consistency()
+        if not self._vectorized_ac3():
+            return None
         self.ac3()
         return self.backtrack(dict())
 
+    def _vectorized_ac3(self):
+        """
+        Run the initial AC-3 pass over contiguous byte matrices.
+
+        Each domain is laid out as a (|D|, length) uint8 array of ASCII
+        codes, sorted so equal-prefix words sit together, and revision
+        becomes one broadcast compare per arc instead of per-word bucket
+        lookups. Only the pre-search propagation -- where domains are at
+        their largest -- goes through this path; survivors are synced
+        back into the set-based domains the search uses. Returns False
+        if a domain empties, True otherwise (including when NumPy is
+        unavailable or words are not ASCII, in which case ac3() does the
+        work as before).
+        """
+        if np is None:
+            return True
+
+        words = {}
+        matrices = {}
+        try:
+            for var in self.domains:
+                ordered = sorted(self.domains[var])
+                words[var] = ordered
+                matrices[var] = np.frombuffer(
+                    "".join(ordered).encode("ascii"), dtype=np.uint8
+                ).reshape(len(ordered), var.length)
+        except (UnicodeEncodeError, ValueError):
+            return True
+
+        queue = deque(self._ov)
+        while queue:
+            x, y = queue.popleft()
+            x_overlap_index, y_overlap_index = self._ov[x, y]
+
+            # x_word survives iff its overlap byte appears anywhere in
+            # y's overlap column: a single broadcast compare
+            supported = (
+                matrices[x][:, x_overlap_index, None]
+                == matrices[y][None, :, y_overlap_index]
+            ).any(axis=1)
+            if not supported.all():
+                keep = supported.nonzero()[0]
+                if keep.size == 0:
+                    return False
+                matrices[x] = matrices[x][keep]
+                words[x] = [words[x][i] for i in keep]
+                for z in self._neighbors[x]:
+                    if z != y:
+                        queue.append((z, x))
+
+        # Sync removals into the set domains and letter buckets; going
+        # through _discard_word keeps the search's index consistent
+        for var in self.domains:
+            for word in self.domains[var] - set(words[var]):
+                self._discard_word(var, word)
+        return True
+
     def enforce_node_consistency(self):
         """
         Update `self.domains` such that each variable is node-consistent.
         (Remove any values that are inconsistent with a variable's unary
          constraints; in this case, the length of the word.)
         """
-        domain_copy = deepcopy(self.domains)
-
-        for var in domain_copy:
-            for word in domain_copy[var]:
-                if len(word) != var.length:
-                    self.domains[var].remove(word)
+        for var in self.domains:
+            self.domains[var] = {
+                word for word in self.domains[var]
+                if len(word) == var.length
+            }
+        self._rebuild_letter_index()
 
 
     def revise(self, x, y):
@@ -120,23 +259,19 @@ class CrosswordCreator():
         """
         revised = False
 
-        if self.crossword.overlaps[x, y]:
-
-            x_overlap_index, y_overlap_index = self.crossword.overlaps[x, y]
-            x_copy = self.domains[x].copy()
+        overlap = self._ov.get((x, y))
+        if overlap:
 
-            for x_word in x_copy:
-                is_arc_consistent = False
+            x_overlap_index, y_overlap_index = overlap
+            y_bucket = self._letter_at[y][y_overlap_index]
 
-                for y_word in self.domains[y]:
-
-                    if x_word[x_overlap_index] == y_word[y_overlap_index]:
-                        is_arc_consistent = True
-                        
-                if not is_arc_consistent:
-                    self.domains[x].remove(x_word)
+            # x_word has support in y's domain iff some y_word shares its
+            # character at the overlap: one bucket lookup per x_word
+            for x_word in list(self.domains[x]):
+                if not y_bucket.get(x_word[x_overlap_index]):
+                    self._discard_word(x, x_word)
                     revised = True
-        
+
         return revised
 
 
@@ -149,20 +284,22 @@ class CrosswordCreator():
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
         """
-        queue = list()
+        # deque gives O(1) popleft; list.pop(0) shifts the whole queue
         if arcs:
-            queue = arcs
+            queue = deque(arcs)
         else:
-            for x in self.domains:
-                for y in self.crossword.neighbors(x):
-                    queue.append((x, y))
-        
-        while len(queue) != 0:
-            x, y = queue.pop(0)
+            queue = deque(
+                (x, y)
+                for x in self.domains
+                for y in self._neighbors[x]
+            )
+
+        while queue:
+            x, y = queue.popleft()
             if self.revise(x, y):
                 if len(self.domains[x]) == 0:
                     return False
-                for z in self.crossword.neighbors(x):
+                for z in self._neighbors[x]:
                     if z != y:
                         queue.append((z, x))
 
@@ -174,47 +311,53 @@ class CrosswordCreator():
         Return True if `assignment` is complete (i.e., assigns a value to each
         crossword variable); return False otherwise.
         """
-        # Every variable in the crossword is in assignment
-        for var in self.crossword.variables:
-            if var not in assignment or assignment[var] == None:
-                return False
+        # backtrack only ever adds crossword variables with real values,
+        # so comparing sizes is enough
+        return len(assignment) == self._nvars
 
-        return True
-
-    def consistent(self, assignment):
+    def consistent(self, assignment, new_var=None):
         """
         Return True if `assignment` is consistent (i.e., words fit in crossword
         puzzle without conflicting characters); return False otherwise.
+
+        If `new_var` is given, only the constraints it participates in
+        are checked -- the rest of the assignment was validated as it was
+        built up, so each search step costs O(degree) instead of
+        re-validating every variable.
         """
+        if new_var is not None:
+            word = assignment[new_var]
+            if new_var.length != len(word):
+                return False
+            if word in self._used_words:
+                return False
+            for neighbor in self._neighbors[new_var]:
+                if neighbor in assignment:
+                    x_overlap_index, y_overlap_index = self._ov[new_var, neighbor]
+                    if word[x_overlap_index] != assignment[neighbor][y_overlap_index]:
+                        return False
+            return True
+
+        # Check for duplicate values in one hashed pass
+        values = list(assignment.values())
+        if len(set(values)) != len(values):
+            return False
 
-        checked = []
         for var in assignment:
 
             # Check that each word is the proper length for the corresponding var
             if var.length != len(assignment[var]):
                 return False
-            
-            # Check for conflicting characters between neighbors
-            for neighbor in self.crossword.neighbors(var):
 
-                # avoid repeating for combinations already checked
-                if (var, neighbor) in checked or (neighbor, var) in checked:
-                    continue
-
-                x_overlap_index, y_overlap_index = self.crossword.overlaps[var, neighbor]
+            # Check for conflicting characters between neighbors; each
+            # directed edge is checked once, which is cheap enough to skip
+            # tracking already-seen pairs
+            for neighbor in self._neighbors[var]:
                 if neighbor in assignment:
+                    x_overlap_index, y_overlap_index = self._ov[var, neighbor]
                     if assignment[var][x_overlap_index] != assignment[neighbor][y_overlap_index]:
                         return False
 
-            checked.append((var, neighbor))
-
-            # Check for duplicate values
-            for var2 in assignment:
-                if var == var2:
-                    continue
-                if assignment[var] == assignment[var2]:
-                    return False
-
         return True
 
     def order_domain_values(self, var, assignment):
@@ -236,17 +379,23 @@ class CrosswordCreator():
         for word in self.domains[var]:
             word_rank[word] = 0
 
-            for neighbor in self.crossword.neighbors(var):
+            for neighbor in self._neighbors[var]:
                 if neighbor in assignment:
                     continue
-                x_overlap_index, y_overlap_index = self.crossword.overlaps[var, neighbor]
-                for neighbor_word in self.domains[neighbor]:
-
-                    # remove word from neighbor's domain and 
-                    # remove any words from neighbor's domain that conflicts
-                    # with the word in var's domain
-                    if neighbor_word == word or word[x_overlap_index] != neighbor_word[y_overlap_index]:
-                        word_rank[word] += 1
+                x_overlap_index, y_overlap_index = self._ov[var, neighbor]
+
+                # a neighbor word is ruled out if it conflicts at the
+                # overlap or duplicates the candidate word itself; count
+                # via the letter buckets instead of scanning the domain
+                matching = self._letter_at[neighbor][y_overlap_index].get(
+                    word[x_overlap_index]
+                )
+                ruled_out = len(self.domains[neighbor])
+                if matching:
+                    ruled_out -= len(matching)
+                    if word in matching:
+                        ruled_out += 1
+                word_rank[word] += ruled_out
 
         domain_values = sorted(word_rank.items(), key=lambda x: x[1])
 
@@ -272,63 +421,15 @@ class CrosswordCreator():
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
         """
-        # TODO
-        # Optimize
-
-        # DEBUGGING
-        print(f'Unassigned Variables: ')
-        for variable in self.domains:
-            if variable not in assignment:
-                print(f'    {variable} Domain Length: {len(self.domains[variable])}')
-
-        # Find size of smallest domain
-        smallest_domains = []
-        smallest_domain_size = float('inf')
-        for var in self.crossword.variables:
-            if var in assignment:
-                continue
-            if len(self.domains[var]) == smallest_domain_size:
-                smallest_domains.append(var)
-            if len(self.domains[var]) < smallest_domain_size:
-                smallest_domains = [var]
-                smallest_domain_size = len(self.domains[var])
-
-        # If there is only one smallest domain, return that var
-        if len(smallest_domains) == 1:
-            # DEBUGGING
-            print(f'Only one var has smallest domain: {smallest_domains[0]}')
-            return smallest_domains[0]
-
-        # Among those tied for smallest domain, find the one with
-        # the largest degree of neighbors not already assigned     
-        largest_degree = []
-        most_neighbors = 0
-        for v in smallest_domains:
-            unassigned_neighbors = [neighbor
-                            for neighbor in self.crossword.neighbors(v)
-                            if neighbor not in assignment]
-            if len(unassigned_neighbors) == most_neighbors:
-                largest_degree.append(v)
-            if len(unassigned_neighbors) > most_neighbors:
-                largest_degree = [v]
-                most_neighbors = len(unassigned_neighbors)
-        
-        # DEBUGGING
-        print(f'Vars with lowest domains and most neighbors: ')
-        for ld in largest_degree:
-            print(f'    {ld} has a domain of {len(self.domains[ld])}')
-            unassigned_neighbors = [neighbor
-                            for neighbor in self.crossword.neighbors(ld)
-                            if neighbor not in assignment]
-            print(f'    and {len(unassigned_neighbors)} unassigned neighbors')
-        print(f'')
-        print(f'')
-
-        return choice(largest_degree)
-            
-
-            
-            
+        # Smallest domain first, then most unassigned neighbors; the
+        # tuple key handles both criteria in a single pass
+        return min(
+            self._unassigned,
+            key=lambda v: (
+                len(self.domains[v]),
+                -len(self._neighbors[v] & self._unassigned)
+            )
+        )
 
     def backtrack(self, assignment):
         """
@@ -339,42 +440,35 @@ class CrosswordCreator():
 
         If no assignment is possible, return None.
         """
-        # TODO
-        # Could still optimize by interleaving arc-consistency with the search
-        
         if self.assignment_complete(assignment):
             return assignment
-  
+
         var = self.select_unassigned_variable(assignment)
         for value in self.order_domain_values(var, assignment):
 
-            # Add a new variable to assignment  
+            # Add a new variable to assignment
             assignment[var] = value
-
-            # Create a copy of self.domains as it is,
-            # So that after modifying it through the AC-3 algorithm
-            # It can be reversed if the result fails
-            domains_copy = deepcopy(self.domains)
-
-            # Is the variable consistent? i.e. does it conflict
-            if self.consistent(assignment):
-
-                # Update self.domains to reflect current assignment
-                # And check for arc consistency with new self.domain and
-                # new assigned var
-                arcs = []
-                for variable in assignment:
-                    self.domains[variable] = {assignment[variable]}
-
-                    # DEBUGGING
-                    # print(f'self.domains[{variable}] = {assignment[variable]}')
-
-                    for neighbor in self.crossword.neighbors(variable):
-                        if neighbor not in assignment:
-                            arcs.append((neighbor, variable))
-
-                # DEBUGGING
-                # print(f'arcs being passed in: {arcs}')
+            self._unassigned.discard(var)
+
+            # Is the new variable consistent? i.e. does it conflict
+            if self.consistent(assignment, var):
+                self._used_words.add(value)
+
+                # Record where the trail stands so every domain pruning
+                # made below can be undone if this value fails
+                mark = len(self._trail)
+
+                # Restrict var's domain to the assigned value, then
+                # propagate to unassigned neighbors with AC-3; earlier
+                # assignments were already propagated at their own level
+                for word in list(self.domains[var]):
+                    if word != value:
+                        self._discard_word(var, word)
+                arcs = [
+                    (neighbor, var)
+                    for neighbor in self._neighbors[var]
+                    if neighbor not in assignment
+                ]
 
                 if self.ac3(arcs):
 
@@ -382,9 +476,13 @@ class CrosswordCreator():
                     if result:
                         return result
 
-            # var didn't work so remove it and try another        
+                # Undo every pruning made while trying this value
+                self._undo_to(mark)
+                self._used_words.discard(value)
+
+            # var didn't work so remove it and try another
             del assignment[var]
-            self.domains = deepcopy(domains_copy)
+            self._unassigned.add(var)
 
         return None
 
@@ -2,11 +2,21 @@ import os
 import random
 import re
 import sys
-from numpy.random import choice
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Compiled once at import; matching on bytes skips decoding whole HTML
+# files when only the link targets are kept
+LINK_RE = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", re.IGNORECASE)
+
 
 def main():
     if len(sys.argv) != 2:
@@ -34,17 +44,17 @@ def crawl(directory):
     for filename in os.listdir(directory):
         if not filename.endswith(".html"):
             continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
-
-    # Only include links to other pages in the corpus
+        with open(os.path.join(directory, filename), "rb") as f:
+            links = set(
+                match.decode() for match in LINK_RE.findall(f.read())
+            )
+            pages[filename] = links - {filename}
+
+    # Only include links to other pages in the corpus; the dict keys
+    # view supports set intersection at C level
+    corpus_pages = pages.keys()
     for filename in pages:
-        pages[filename] = set(
-            link for link in pages[filename]
-            if link in pages
-        )
+        pages[filename] &= corpus_pages
 
     return pages
 
@@ -73,6 +83,27 @@ def transition_model(corpus, page, damping_factor):
     return probabilities
 
 
+def link_matrix(corpus):
+    """
+    Return (pages, matrix) where matrix[i, j] is the probability of
+    moving from page j to page i by following a link at random.
+    A page with no links is interpreted as linking to every page in
+    the corpus, including itself.
+    """
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    n = len(pages)
+    matrix = np.zeros((n, n))
+    for j, page in enumerate(pages):
+        links = corpus[page]
+        if links:
+            for link in links:
+                matrix[index[link], j] = 1 / len(links)
+        else:
+            matrix[:, j] = 1 / n
+    return pages, matrix
+
+
 def sample_pagerank(corpus, damping_factor, n):
     """
     Return PageRank values for each page by sampling `n` pages
@@ -82,24 +113,31 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    visited_pages = dict()
-    page = random.choice(list(corpus.keys()))
-    next_transition_model = transition_model(corpus, page, damping_factor)
-    for i in range(n):
-        visited_pages[page] = visited_pages.get(page, 0) + 1
-        trans_keys = []
-        trans_values = []
-        for probability in next_transition_model:
-            trans_keys.append(probability)
-            trans_values.append(next_transition_model[probability])
-        page = random.choices(trans_keys, trans_values)[0]
-        next_transition_model = transition_model(corpus, page, damping_factor)
-
-    ranks = dict()
-    for each_page in visited_pages:
-        ranks[each_page] = visited_pages[each_page] / n
-
-    return ranks
+    pages, matrix = link_matrix(corpus)
+    num_pages = len(pages)
+
+    # Full transition probabilities (random-jump component plus damped
+    # link-following), computed once instead of rebuilding a dict per
+    # sample; cumulative sums per column let each step sample with a
+    # single binary search
+    transition = (1 - damping_factor) / num_pages + damping_factor * matrix
+
+    # Transpose so each page's cumulative distribution is a contiguous
+    # row rather than a strided column slice, and bind the loop's
+    # method lookups to locals once
+    cumulative = np.ascontiguousarray(transition.cumsum(axis=0).T)
+    rng = np.random.default_rng()
+    draw = rng.random
+    searchsorted = np.searchsorted
+    last_page = num_pages - 1
+
+    counts = np.zeros(num_pages, dtype=np.int64)
+    page = rng.integers(num_pages)
+    for _ in range(n):
+        counts[page] += 1
+        page = min(searchsorted(cumulative[page], draw()), last_page)
+
+    return dict(zip(pages, counts / n))
 
 
 def iterate_pagerank(corpus, damping_factor):
@@ -111,40 +149,52 @@ def iterate_pagerank(corpus, damping_factor):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    ranks = dict()
-    for page in corpus:
-        ranks[page] = 1 / len(corpus)
-
-    keep_iterating = True
-    while keep_iterating:
-
-        new_ranks = ranks.copy()
-
-        for first_page in ranks:
-            sum = 0
-            for other_page in ranks:
-                if other_page == first_page:
-                    continue
+    pages, matrix = link_matrix(corpus)
+    return dict(zip(pages, _iterate_ranks(matrix, damping_factor, 0.001)))
 
-                # if the page has no links, interpret as linking to all pages
-                if len(corpus[other_page]) == 0:
-                    sum += (ranks[other_page] / len(corpus))
 
-                if first_page in corpus[other_page]:
-                    num_links = len(corpus[other_page])
-                    sum += (ranks[other_page] / num_links)
-
-            new_ranks[first_page] = ((1 - damping_factor) / len(ranks)) + (damping_factor * sum)
-
-        keep_iterating = False
-        for page_check in new_ranks:
-            if abs(ranks[page_check] - new_ranks[page_check]) > 0.001:
-                keep_iterating = True
-                break
-        ranks = new_ranks.copy()
+def _iterate_ranks(matrix, damping_factor, tol):
+    """
+    Iterate r = (1-d)/N + d * (M @ r) from a uniform start until the
+    largest rank change is within `tol`. One matrix-vector multiply
+    replaces the Python double loop over (page, other_page).
+    """
+    n = matrix.shape[0]
+    ranks = np.full(n, 1 / n)
+    while True:
+        new_ranks = (1 - damping_factor) / n + damping_factor * (matrix @ ranks)
+        if np.max(np.abs(new_ranks - ranks)) <= tol:
+            return new_ranks
+        ranks = new_ranks
+
+
+# When numba is available, replace the convergence loop with a compiled
+# kernel; the explicit loops avoid per-iteration array allocations and
+# numba's BLAS dependency, and LLVM vectorizes them. The pure-NumPy
+# version above is the fallback.
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def _iterate_ranks(matrix, damping_factor, tol):
+        n = matrix.shape[0]
+        base = (1 - damping_factor) / n
+        ranks = np.full(n, 1 / n)
+        new_ranks = np.empty(n)
+        while True:
+            delta = 0.0
+            for i in range(n):
+                total = 0.0
+                for j in range(n):
+                    total += matrix[i, j] * ranks[j]
+                new_rank = base + damping_factor * total
+                change = abs(new_rank - ranks[i])
+                if change > delta:
+                    delta = change
+                new_ranks[i] = new_rank
+            if delta <= tol:
+                return new_ranks
+            ranks[:] = new_ranks
 
-    return ranks
-    
 
 
 if __name__ == "__main__":
@@ -3,7 +3,6 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
 
 X = "X"
 O = "O"
@@ -48,48 +47,78 @@ def actions(board):
     return actions
 
 
-def result(board, action):
+def result(board, action, turn=None):
     """
     Returns the board that results from making move (i, j) on the board.
+    The mover can be passed as `turn` to skip re-deriving it from the
+    board; it defaults to player(board).
     """
     # if action not valid, raise exception
     if action not in actions(board):
         raise Exception("Not a valid action")
 
-    new_board = copy.deepcopy(board)
-    new_board[action[0]][action[1]] = player(board)
+    # cells are immutable strings, so slice-copying each row is enough
+    new_board = [row[:] for row in board]
+    new_board[action[0]][action[1]] = turn if turn is not None else player(board)
     return new_board
 
 
+# The eight winning lines as 9-bit masks, cell (i, j) -> bit 3*i + j:
+# three rows, three columns, two diagonals
+_WIN_LINES = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+_FULL_BOARD = 0b111111111
+
+
+def masks(board):
+    """
+    Returns (x_mask, o_mask): 9-bit occupancy masks for each player.
+    """
+    x_mask = 0
+    o_mask = 0
+    bit = 1
+    for row in board:
+        for cell in row:
+            if cell == X:
+                x_mask |= bit
+            elif cell == O:
+                o_mask |= bit
+            bit <<= 1
+    return x_mask, o_mask
+
+
+def winner_from_masks(x_mask, o_mask):
+    """
+    Returns the winner encoded in a pair of occupancy masks, if any.
+    """
+    for line in _WIN_LINES:
+        if x_mask & line == line:
+            return X
+        if o_mask & line == line:
+            return O
+    return None
+
+
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     Specific to a 3x3 board
     """
-    for i in range(len(board)):
-        if board[0][i] == board[1][i] == board[2][i] != EMPTY:
-            return board[0][i]
-        if board[i][0] == board[i][1] == board[i][2] != EMPTY:
-            return board[i][0]
-    if board[0][0] == board[1][1] == board[2][2] != EMPTY:
-        return board[0][0]
-    if board[0][2] == board[1][1] == board[2][0] != EMPTY:
-        return board[0][2]
-    return None
-
+    return winner_from_masks(*masks(board))
 
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) != None:
+    x_mask, o_mask = masks(board)
+    if winner_from_masks(x_mask, o_mask) is not None:
         return True
-    for row in board:
-        for cell in row:
-            if cell == EMPTY:
-                return False
-    return True
+    return (x_mask | o_mask) == _FULL_BOARD
 
 
 def utility(board):
@@ -104,6 +133,24 @@ def utility(board):
         return 0
 
 
+def encode(board):
+    """
+    Encode a board as an integer, two bits per cell. Tic-tac-toe only
+    has a few thousand reachable states, so this keys a cache cheaply.
+    """
+    value = 0
+    for row in board:
+        for cell in row:
+            value = (value << 2) | (0 if cell is None else 1 if cell == X else 2)
+    return value
+
+
+# Memoized search values, keyed by encoded state plus the (alpha, beta)
+# window: with pruning, a value computed under a narrow window may only
+# be a bound, so it is reusable only for the same window
+_cache = {}
+
+
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
@@ -112,35 +159,58 @@ def minimax(board):
     if terminal(board):
         return None
 
-    optimal_action = list(actions(board))[0]
-    opt_min_value = minValue(result(board, optimal_action))
-    opt_max_value = maxValue(result(board, optimal_action))
-    for action in actions(board):
-        if player(board) == X:
-            action_min_value = minValue(result(board, action))
-            if action_min_value > opt_min_value:
+    # The best value found so far doubles as the alpha (or beta) bound
+    # for the remaining actions, so provably worse branches are cut off
+    # Derive whose turn it is once at the root and thread it through
+    # the search; X moves on even plies, O on odd
+    optimal_action = None
+    if player(board) == X:
+        best_value = -math.inf
+        for action in actions(board):
+            action_value = minValue(result(board, action, X), best_value, math.inf)
+            if action_value > best_value:
                 optimal_action = action
-                opt_min_value = action_min_value
-        if player(board) == O:
-            action_max_value = maxValue(result(board, action))
-            if action_max_value < opt_max_value:
+                best_value = action_value
+    else:
+        best_value = math.inf
+        for action in actions(board):
+            action_value = maxValue(result(board, action, O), -math.inf, best_value)
+            if action_value < best_value:
                 optimal_action = action
-                opt_max_value = action_max_value
+                best_value = action_value
     return optimal_action
 
 
-def maxValue(board):
-    max_value = -math.inf
+def maxValue(board, alpha, beta):
+    key = (encode(board), alpha, beta)
+    if key in _cache:
+        return _cache[key]
     if terminal(board):
-        return utility(board)
+        value = utility(board)
+        _cache[key] = value
+        return value
+    max_value = -math.inf
     for action in actions(board):
-        max_value = max(max_value, minValue(result(board, action)))
+        max_value = max(max_value, minValue(result(board, action, X), alpha, beta))
+        if max_value >= beta:
+            break
+        alpha = max(alpha, max_value)
+    _cache[key] = max_value
     return max_value
 
-def minValue(board):
-    min_value = math.inf
+def minValue(board, alpha, beta):
+    key = (encode(board), alpha, beta)
+    if key in _cache:
+        return _cache[key]
     if terminal(board):
-        return utility(board)
+        value = utility(board)
+        _cache[key] = value
+        return value
+    min_value = math.inf
     for action in actions(board):
-        min_value = min(min_value, maxValue(result(board, action)))
+        min_value = min(min_value, maxValue(result(board, action, O), alpha, beta))
+        if min_value <= alpha:
+            break
+        beta = min(beta, min_value)
+    _cache[key] = min_value
     return min_value
@@ -3,7 +3,6 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
 
 X = "X"
 O = "O"
@@ -56,7 +55,8 @@ def result(board, action):
     if action not in actions(board):
         raise Exception("Not a valid action")
 
-    new_board = copy.deepcopy(board)
+    # cells are immutable strings, so slice-copying each row is enough
+    new_board = [row[:] for row in board]
     new_board[action[0]][action[1]] = player(board)
     return new_board
 